@@ -0,0 +1,70 @@
+"""
+Benchmark clean_document against the previous BeautifulSoup + multi-regex
+implementation on multi-megabyte plain text and HTML inputs.
+
+Run from the repository root:
+    python -m benchmarks.bench_clean_document
+"""
+import re
+import time
+
+from bs4 import BeautifulSoup
+
+from utils.document_processor import clean_document
+
+
+def legacy_clean_document(text):
+    soup = BeautifulSoup(text, "html.parser")
+    text = soup.get_text()
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[^\w\s\.\,\;\:\(\)\[\]\{\}\-\"\'\?]', '', text)
+    text = re.sub(r'(\r\n|\r|\n)', '\n', text)
+    return text.strip()
+
+
+# Inputs where a markup check or parser switch could change the output
+EDGE_CASES = [
+    "If x<y the Seller may terminate. The Buyer shall pay.",
+    "x<y " + "word " * 100000,
+    "a &amp b, &copy 2024, price &lt 5",
+    "AT&T and Smith & Co",
+    "<![CDATA[foo]]> bar",
+    "<p>x</p><![CDATA[foo]]>",
+    "<p>a &amp b &copy 2024 &lt 5</p>",
+    "a < b <p>c</p> 1<2 and 3>2",
+    "<!DOCTYPE html><html><body><!-- note -->hi<br/></body></html>",
+]
+
+
+def build_inputs(target_mb):
+    with open("sample_legal_doc.txt", encoding="utf-8") as f:
+        sample = f.read()
+    repeats = max(1, (target_mb * 1024 * 1024) // len(sample))
+    plain = "\n\n".join([sample] * repeats)
+    paragraphs = "".join(f"<p>{p.replace('&', '&amp;')}</p>\n" for p in sample.split("\n\n"))
+    head = "<head><style>p { margin: 0; }</style><script>var loaded = true;</script></head>"
+    html = "<html>" + head + "<body>" + paragraphs * repeats + "</body></html>"
+    return {"plain": plain, "html": html}
+
+
+def time_call(fn, text, rounds=3):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    for text in EDGE_CASES:
+        assert clean_document(text) == legacy_clean_document(text), text[:60]
+
+    for size_mb in (1, 4, 16):
+        for kind, text in build_inputs(size_mb).items():
+            # Well-formed HTML (script and style included) must clean to the same text
+            assert clean_document(text) == legacy_clean_document(text)
+            legacy = time_call(legacy_clean_document, text)
+            current = time_call(clean_document, text)
+            print(f"{kind:>5} {len(text) / 1e6:6.1f} MB  legacy {legacy:7.3f}s  "
+                  f"current {current:7.3f}s  speedup {legacy / current:5.1f}x")
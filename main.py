@@ -19,11 +19,7 @@ class LegalDocumentAnalyzer:
         classified_sections = self.clause_classifier.classify_document_sections(sections)
         extraction_results = self.obligation_extractor.extract_from_sections(sections)
 
-        user_profile = {}
-        if user_profile_concerns:
-            user_profile["concerns"] = [c.strip() for c in user_profile_concerns.split(',')]
-        if user_profile_role:
-            user_profile["role"] = user_profile_role.strip()
+        user_profile = self._build_user_profile(user_profile_concerns, user_profile_role)
 
         if user_profile:
             personalized_results = self._personalize_results(
@@ -48,6 +44,57 @@ class LegalDocumentAnalyzer:
             "personalized_insights": personalized_results
         }
 
+    def analyze_document_stream(self, document_text, user_profile_concerns=None, user_profile_role=None):
+        """
+        Analyze a legal document section by section, yielding results as they complete.
+
+        The first event carries the entities; each following event carries one
+        section in the same shape as analyze_document's "sections" entries, plus
+        the personalized insights found in that section (None without a profile).
+        A final "complete" event carries all insights in analyze_document's
+        order (concern matches first, then role obligations), replacing the
+        per-section ones.
+        """
+        entities = self.ner(document_text)
+        yield {"type": "entities", "entities": entities}
+
+        user_profile = self._build_user_profile(user_profile_concerns, user_profile_role)
+        classified_sections = []
+        extraction_results = []
+        for section in segment_document(document_text):
+            section_info = self.clause_classifier.classify_section(section)
+            extractions = self.obligation_extractor.extract_from_section(section)
+            classified_sections.append(section_info)
+            extraction_results.append(extractions)
+            if user_profile:
+                insights = self._personalize_results([section_info], [extractions], entities, user_profile)
+            else:
+                insights = None
+            yield {
+                "type": "section",
+                "section": {"section_info": section_info, "extractions": extractions},
+                "personalized_insights": insights
+            }
+
+        if user_profile:
+            personalized_results = self._personalize_results(
+                classified_sections,
+                extraction_results,
+                entities,
+                user_profile
+            )
+        else:
+            personalized_results = None
+        yield {"type": "complete", "personalized_insights": personalized_results}
+
+    def _build_user_profile(self, user_profile_concerns, user_profile_role):
+        user_profile = {}
+        if user_profile_concerns:
+            user_profile["concerns"] = [c.strip() for c in user_profile_concerns.split(',')]
+        if user_profile_role:
+            user_profile["role"] = user_profile_role.strip()
+        return user_profile
+
     def _personalize_results(self, classified_sections, extraction_results, entities, user_profile):
         insights = []
         if "concerns" in user_profile:
@@ -74,7 +121,7 @@ class LegalDocumentAnalyzer:
                         })
         return insights
 
-def format_results_gradio(results):
+def format_results_gradio(results, in_progress=False):
     output = "=== LEGAL DOCUMENT ANALYSIS ===\n\n"
     output += "KEY ENTITIES FOUND:\n"
     for entity_type, entity_list in results["entities"].get("grouped_entities", {}).items():
@@ -96,17 +143,38 @@ def format_results_gradio(results):
             elif insight["type"] == "role_obligation":
                 obligation = insight.get("obligation", "take action")
                 output += f"- OBLIGATION: As a party, you must {obligation} (in section '{insight['section']}')\n"
+        if in_progress:
+            output += "(analyzing remaining sections...)\n"
+    elif in_progress and (results.get("personalized_insights") is not None or not results["sections"]):
+        # A profile was given (or it isn't known yet) but no insight has been found so far
+        output += "\nPERSONALIZED INSIGHTS:\n(analyzing sections...)\n"
     else:
         output += "\nNo personalized insights available. Try providing concerns and role.\n"
     return output
 
-if __name__ == "__main__":
-    analyzer = LegalDocumentAnalyzer()
-
-    def analyze(document_text, concerns, role):
-        results = analyzer.analyze_document(document_text, user_profile_concerns=concerns, user_profile_role=role)
-        return format_results_gradio(results)
+def format_results_gradio_stream(events):
+    """
+    Render analyze_document_stream events, yielding the updated output after
+    each one. Until the "complete" event arrives, the insights part says that
+    sections are still being analyzed.
+    """
+    results = {"entities": {}, "sections": [], "personalized_insights": None}
+    in_progress = True
+    for event in events:
+        if event["type"] == "entities":
+            results["entities"] = event["entities"]
+        elif event["type"] == "section":
+            results["sections"].append(event["section"])
+            if event["personalized_insights"] is not None:
+                if results["personalized_insights"] is None:
+                    results["personalized_insights"] = []
+                results["personalized_insights"].extend(event["personalized_insights"])
+        elif event["type"] == "complete":
+            results["personalized_insights"] = event["personalized_insights"]
+            in_progress = False
+        yield format_results_gradio(results, in_progress=in_progress)
 
+def build_interface(analyze, concurrency=1):
     iface = gr.Interface(
         fn=analyze,
         inputs=[
@@ -118,7 +186,19 @@ if __name__ == "__main__":
         title="Legal Document Analyzer",
         description="Upload or paste the text of a legal document to analyze key entities, clause types, and get personalized insights based on your concerns and role."
     )
+    # Generator handlers (streaming output) need the queue enabled; it runs
+    # concurrency events at a time
+    iface.queue(concurrency_count=concurrency)
+    return iface
+
+if __name__ == "__main__":
+    analyzer = LegalDocumentAnalyzer()
+
+    def analyze(document_text, concerns, role):
+        events = analyzer.analyze_document_stream(document_text, user_profile_concerns=concerns, user_profile_role=role)
+        yield from format_results_gradio_stream(events)
 
+    iface = build_interface(analyze)
     iface.launch(share=True)
     
 # from models.ner import implement_legal_ner
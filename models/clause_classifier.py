@@ -20,6 +20,16 @@ class ClauseClassifier:
         # Fine-tune the model with your annotated data
         # self.fine_tune(training_data)
     
+    def share_memory(self):
+        """
+        Freeze the model weights and move them into shared memory so forked
+        worker processes reuse the parent's copy instead of duplicating it
+        """
+        self.model.eval()
+        for param in self.model.parameters():
+            param.requires_grad_(False)
+        self.model.share_memory()
+
     def fine_tune(self, training_data):
         """
         Fine-tune the model with annotated clause data
@@ -61,19 +71,18 @@ class ClauseClassifier:
         Classify multiple sections of a document
         sections: List of {"title": "section title", "content": "section text"}
         """
-        results = []
-        
-        for section in sections:
-            classification = self.classify_clause(section["content"])
-            results.append({
-                "section_title": section["title"],
-                "section_text": section["content"][:100] + "...",  # Preview
-                "classification": classification["predicted_label"],
-                "confidence": classification["confidence"],
-                "all_labels": classification["all_scores"]
-            })
-            
-        return results
+        return [self.classify_section(section) for section in sections]
 
-# Usage
-clause_classifier = ClauseClassifier()
\ No newline at end of file
+    def classify_section(self, section):
+        """
+        Classify a single section
+        section: {"title": "section title", "content": "section text"}
+        """
+        classification = self.classify_clause(section["content"])
+        return {
+            "section_title": section["title"],
+            "section_text": section["content"][:100] + "...",  # Preview
+            "classification": classification["predicted_label"],
+            "confidence": classification["confidence"],
+            "all_labels": classification["all_scores"]
+        }
@@ -1,6 +1,9 @@
 import spacy
 from transformers import pipeline
 import re
+import time
+
+from utils.dedup import SentenceDeduplicator, normalize_sentence
 
 class ObligationRightsExtractor:
     def __init__(self):
@@ -34,10 +37,30 @@ class ObligationRightsExtractor:
             r'\b(?:Company|User|Subscriber|Member|Patient|Insurer|Insured|Owner)\b'
         ]
         
+    def share_memory(self):
+        """
+        Freeze the zero-shot model weights and move them into shared memory so
+        forked worker processes reuse the parent's copy instead of duplicating it
+        """
+        model = self.zero_shot.model
+        model.eval()
+        for param in model.parameters():
+            param.requires_grad_(False)
+        model.share_memory()
+
     def extract_sentences(self, text):
         """Split text into sentences"""
         doc = self.nlp(text)
         return [sent.text.strip() for sent in doc.sents]
+
+    def extract_sentence_spans(self, text):
+        """Split text into sentences, keeping each one's character offsets in text"""
+        spans = []
+        for sent in self.nlp(text).sents:
+            sentence = sent.text.strip()
+            start = sent.start_char + (len(sent.text) - len(sent.text.lstrip()))
+            spans.append((sentence, start, start + len(sentence)))
+        return spans
     
     def classify_sentence(self, sentence):
         """Classify a sentence as obligation, right, or other"""
@@ -209,6 +232,22 @@ class ObligationRightsExtractor:
         
         return conditions if conditions else None
     
+    def analyze_sentence(self, sentence):
+        """Classify a sentence and, for obligations and rights, extract its details"""
+        sentence_type = self.classify_sentence(sentence)
+
+        if sentence_type in ["obligation", "right"]:
+            return sentence_type, self.extract_details(sentence)
+        return sentence_type, {}
+
+    def extract_details(self, sentence):
+        """Extract the party, action and conditions of an obligation or right"""
+        return {
+            "party": self.identify_party(sentence),
+            "action": self.extract_action(sentence),
+            "conditions": self.extract_conditions(sentence)
+        }
+
     def extract_from_text(self, text):
         """Extract obligations and rights from the full text"""
         sentences = self.extract_sentences(text)
@@ -219,44 +258,97 @@ class ObligationRightsExtractor:
         }
         
         for sentence in sentences:
-            sentence_type = self.classify_sentence(sentence)
+            sentence_type, details = self.analyze_sentence(sentence)
             
             if sentence_type in ["obligation", "right"]:
-                party = self.identify_party(sentence)
-                action = self.extract_action(sentence)
-                conditions = self.extract_conditions(sentence)
-                
-                item = {
-                    "sentence": sentence,
-                    "party": party,
-                    "action": action,
-                    "conditions": conditions
-                }
-                
-                results[sentence_type + "s"].append(item)
+                results[sentence_type + "s"].append({"sentence": sentence, **details})
             else:
                 results["other"].append({"sentence": sentence})
         
         return results
+
+    def extract_from_corpus(self, texts, max_distance=3):
+        """
+        Extract obligations and rights from many documents, classifying each
+        group of exact or near-duplicate sentences only once.
+
+        Sentences are clustered with SentenceDeduplicator (max_distance is the
+        SimHash bit distance for near-duplicates; 0 keeps exact matches only).
+        The first sentence of each cluster is classified and every member gets
+        that classification. Party/action/condition extraction runs once per
+        distinct normalized sentence, so exact duplicates share their details
+        while near-duplicates (e.g. the same clause naming a different party)
+        get details extracted from their own text. Every item keeps its own
+        text and "start"/"end" offsets in its document.
+
+        Returns {"documents": [...], "stats": {...}} where each document has the
+        same shape as extract_from_text's result.
+        """
+        dedup = SentenceDeduplicator(max_distance=max_distance)
+        documents = []
+        for text in texts:
+            documents.append([
+                (sentence, start, end, dedup.add(sentence))
+                for sentence, start, end in self.extract_sentence_spans(text)
+            ])
+
+        started = time.perf_counter()
+        cluster_types = [self.classify_sentence(sentence) for sentence in dedup.representatives]
+        classify_seconds = time.perf_counter() - started
+
+        details_by_sentence = {}
+        detail_items = 0
+        detail_seconds = 0.0
+        results = []
+        for sentences in documents:
+            document_results = {
+                "obligations": [],
+                "rights": [],
+                "other": []
+            }
+            for sentence, start, end, cluster_id in sentences:
+                sentence_type = cluster_types[cluster_id]
+                item = {"sentence": sentence, "start": start, "end": end}
+                if sentence_type not in ["obligation", "right"]:
+                    document_results["other"].append(item)
+                    continue
+
+                detail_items += 1
+                normalized = normalize_sentence(sentence)
+                if normalized not in details_by_sentence:
+                    started = time.perf_counter()
+                    details_by_sentence[normalized] = self.extract_details(sentence)
+                    detail_seconds += time.perf_counter() - started
+                document_results[sentence_type + "s"].append({**item, **details_by_sentence[normalized]})
+            results.append(document_results)
+
+        num_sentences = sum(dedup.sizes)
+        num_clusters = len(dedup.representatives)
+        num_details = len(details_by_sentence)
+        seconds_per_classification = classify_seconds / num_clusters if num_clusters else 0.0
+        seconds_per_details = detail_seconds / num_details if num_details else 0.0
+        return {
+            "documents": results,
+            "stats": {
+                "sentences": num_sentences,
+                "clusters": num_clusters,
+                "detail_extractions": num_details,
+                "dedup_ratio": 1 - num_clusters / num_sentences if num_sentences else 0.0,
+                "extraction_seconds": classify_seconds + detail_seconds,
+                "estimated_seconds_saved": (
+                    (num_sentences - num_clusters) * seconds_per_classification
+                    + (detail_items - num_details) * seconds_per_details
+                )
+            }
+        }
     
     def extract_from_sections(self, sections):
         """Extract obligations and rights from document sections"""
-        results = []
-        
-        for section in sections:
-            section_title = section["title"]
-            section_text = section["content"]
-            
-            extractions = self.extract_from_text(section_text)
-            
-            results.append({
-                "section_title": section_title,
-                "extractions": extractions
-            })
-        
-        return results
+        return [self.extract_from_section(section) for section in sections]
 
-# Usage
-extractor = ObligationRightsExtractor()
-# results = extractor.extract_from_text(legal_text)
-# section_results = extractor.extract_from_sections(document_sections)
\ No newline at end of file
+    def extract_from_section(self, section):
+        """Extract obligations and rights from a single document section"""
+        return {
+            "section_title": section["title"],
+            "extractions": self.extract_from_text(section["content"])
+        }
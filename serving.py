@@ -0,0 +1,579 @@
+import argparse
+import collections
+import gc
+import itertools
+import multiprocessing
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from multiprocessing.connection import Client, Listener, wait
+
+import torch
+
+from main import LegalDocumentAnalyzer, build_interface, format_results_gradio
+
+
+def process_memory(pid):
+    """Return RSS, PSS and shared memory (in kB) of a process, read from /proc"""
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1])
+    except OSError:
+        return None
+
+    return {
+        "rss_kb": fields.get("Rss", 0),
+        "pss_kb": fields.get("Pss", 0),
+        "shared_kb": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)
+    }
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _worker_main(worker_id, analyzer, address, authkey):
+    # Each child gets its own share of the CPU; avoid oversubscribing cores
+    torch.set_num_threads(1)
+
+    conn = Client(address, authkey=authkey)
+    conn.send(("hello", worker_id, os.getpid()))
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+
+        job_id, document_text, concerns, role = task
+        # Tell the pool the job arrived; if this worker dies before the pool
+        # sees this, the job is given to another worker instead of failing
+        conn.send(("start", job_id, None))
+        try:
+            result = analyzer.analyze_document(
+                document_text,
+                user_profile_concerns=concerns,
+                user_profile_role=role
+            )
+        except Exception as e:
+            conn.send(("error", job_id, repr(e)))
+        else:
+            conn.send(("done", job_id, result))
+
+
+def _spawner_main(analyzer, address, authkey, commands):
+    """
+    Fork a worker for every worker id received on commands. This process is
+    forked from the pool before it starts any threads and never starts one
+    itself, so its forks can't inherit a lock held by another thread.
+    """
+    # Exited workers are reaped automatically
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+
+    while True:
+        try:
+            worker_id = commands.recv()
+        except EOFError:
+            break
+        if worker_id is None:
+            break
+
+        if os.fork() == 0:
+            exit_code = 0
+            try:
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                commands.close()
+                _worker_main(worker_id, analyzer, address, authkey)
+            except BaseException:
+                traceback.print_exc()
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+
+
+class AnalyzerPool:
+    """
+    Pre-fork pool of analyzer workers.
+
+    The parent loads the models once, freezes their weights into shared memory
+    and forks a single-threaded spawner process, which forks every worker
+    (including replacements and restarts). Each worker reads the same copy of
+    legal-bert, bart-large-mnli and spaCy instead of loading its own.
+
+    Each worker has its own connection to the parent, which dispatches jobs to
+    idle workers and records every assignment itself, so a worker dying at any
+    point fails only the job it was given. Dead workers are noticed as soon as
+    their connection closes, and by a health check that runs every
+    health_interval seconds.
+
+    The pool must be created before the process starts any other threads
+    (e.g. before launching Gradio), since it forks the spawner in __init__.
+    For the same reason a spawner that dies is not re-forked: queued jobs
+    fail, and submit() raises RuntimeError from then on, while running jobs
+    finish on the remaining workers.
+    """
+
+    def __init__(self, num_workers=None, analyzer=None, health_interval=5.0, startup_timeout=60.0):
+        if threading.active_count() > 1:
+            raise RuntimeError("AnalyzerPool must be created before any other threads are started")
+
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.health_interval = health_interval
+        self.analyzer = analyzer or LegalDocumentAnalyzer()
+        self.analyzer.clause_classifier.share_memory()
+        self.analyzer.obligation_extractor.share_memory()
+
+        # Keep the loaded objects out of the cyclic GC so collections in the
+        # children don't write to (and un-share) the inherited pages
+        gc.collect()
+        gc.freeze()
+
+        self._socket_dir = tempfile.mkdtemp(prefix="analyzer-pool-")
+        self._address = os.path.join(self._socket_dir, "workers.sock")
+        self._authkey = os.urandom(32)
+
+        context = multiprocessing.get_context("fork")
+        self._commands, spawner_commands = context.Pipe()
+        self._spawner = context.Process(
+            target=_spawner_main,
+            args=(self.analyzer, self._address, self._authkey, spawner_commands),
+            daemon=True
+        )
+        self._spawner.start()
+        spawner_commands.close()
+
+        self._listener = Listener(self._address, family="AF_UNIX", authkey=self._authkey)
+        self._wakeup_read, self._wakeup_write = os.pipe()
+        os.set_blocking(self._wakeup_read, False)
+
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._restart_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._job_ids = itertools.count()
+        self._next_worker_id = itertools.count()
+        self._workers = {}
+        self._pending = collections.deque()
+        self._futures = {}
+        self._assignments = {}
+        self._retired = []
+        self._spawner_error = None
+
+        self._threads = [
+            threading.Thread(target=self._accept_workers, daemon=True),
+            threading.Thread(target=self._run_io, daemon=True),
+            threading.Thread(target=self._monitor, daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+        with self._lock:
+            for _ in range(self.num_workers):
+                self._request_worker()
+            started = self._changed.wait_for(lambda: len(self._workers) >= self.num_workers, startup_timeout)
+        if not started:
+            self.shutdown(timeout=0)
+            raise RuntimeError(f"Workers did not start within {startup_timeout} seconds")
+
+    def _wake(self):
+        os.write(self._wakeup_write, b"x")
+
+    def _request_worker(self):
+        # Caller holds self._lock
+        if self._spawner_error is not None:
+            return None
+        worker_id = next(self._next_worker_id)
+        try:
+            self._commands.send(worker_id)
+        except OSError:
+            self._lose_spawner(f"Spawner process (pid {self._spawner.pid}) is gone")
+            return None
+        return worker_id
+
+    def _lose_spawner(self, reason):
+        # Caller holds self._lock; the I/O thread fails the queued jobs
+        if self._spawner_error is None and not self._closed.is_set():
+            self._spawner_error = reason
+            print(f"AnalyzerPool: {reason}; no more workers can be started", file=sys.stderr)
+            self._wake()
+
+    def _accept_workers(self):
+        while not self._closed.is_set():
+            try:
+                conn = self._listener.accept()
+                _, worker_id, pid = conn.recv()
+            except (OSError, EOFError, multiprocessing.AuthenticationError):
+                continue
+
+            with self._lock:
+                if self._closed.is_set():
+                    conn.close()
+                    break
+                self._workers[worker_id] = {
+                    "pid": pid,
+                    "conn": conn,
+                    "stopping": False,
+                    "stop_sent": False,
+                    "exited": threading.Event()
+                }
+                self._changed.notify_all()
+            self._wake()
+
+    def _run_io(self):
+        while not self._closed.is_set():
+            with self._lock:
+                retired, self._retired = self._retired, []
+                conns = {worker["conn"]: worker_id for worker_id, worker in self._workers.items()}
+            for conn in retired:
+                conn.close()
+
+            for ready in wait(list(conns) + [self._wakeup_read], timeout=1.0):
+                if ready == self._wakeup_read:
+                    try:
+                        os.read(self._wakeup_read, 4096)
+                    except BlockingIOError:
+                        pass
+                    continue
+
+                worker_id = conns[ready]
+                try:
+                    message = ready.recv()
+                except (EOFError, OSError):
+                    self._remove_worker(worker_id, f"Worker {worker_id} exited while running the job")
+                    continue
+                self._finish_job(worker_id, message)
+
+            self._dispatch()
+
+    def _finish_job(self, worker_id, message):
+        kind, job_id, payload = message
+        with self._lock:
+            if kind == "start":
+                assignment = self._assignments.get(worker_id)
+                if assignment is not None and assignment["job_id"] == job_id:
+                    assignment["received"] = True
+                return
+            self._assignments.pop(worker_id, None)
+            future = self._futures.pop(job_id, None)
+
+        if future is None:
+            return
+        if kind == "done":
+            future.set_result(payload)
+        else:
+            future.set_exception(RuntimeError(f"Worker {worker_id} failed: {payload}"))
+
+    def _dispatch(self):
+        sends = []
+        with self._lock:
+            if self._spawner_error is not None and self._pending:
+                failed = [self._futures.pop(job_id) for job_id, _ in self._pending if job_id in self._futures]
+                self._pending.clear()
+            else:
+                failed = []
+
+            idle = []
+            for worker_id, worker in self._workers.items():
+                if worker_id in self._assignments:
+                    continue
+                if not worker["stopping"]:
+                    idle.append(worker_id)
+                elif not worker["stop_sent"]:
+                    worker["stop_sent"] = True
+                    sends.append((worker_id, worker["conn"], None))
+
+            while idle and self._pending:
+                job_id, task = self._pending.popleft()
+                # Skips jobs whose caller gave up (cancelled) before dispatch;
+                # requeued jobs are already running
+                future = self._futures[job_id]
+                if not future.running() and not future.set_running_or_notify_cancel():
+                    del self._futures[job_id]
+                    continue
+                worker_id = idle.pop()
+                self._assignments[worker_id] = {
+                    "job_id": job_id,
+                    "task": task,
+                    "started": time.time(),
+                    "received": False
+                }
+                sends.append((worker_id, self._workers[worker_id]["conn"], task))
+
+        self._fail_futures(failed, self._spawner_error)
+        for worker_id, conn, task in sends:
+            try:
+                conn.send(task)
+            except OSError:
+                self._remove_worker(worker_id, f"Worker {worker_id} exited")
+
+    def _remove_worker(self, worker_id, reason):
+        with self._lock:
+            worker = self._workers.pop(worker_id, None)
+            if worker is None:
+                return
+            self._retired.append(worker["conn"])
+            assignment = self._assignments.pop(worker_id, None)
+            future = None
+            if assignment is not None and not assignment["received"]:
+                # The worker died before getting the job, so it can go to another one
+                self._pending.appendleft((assignment["job_id"], assignment["task"]))
+            elif assignment is not None:
+                future = self._futures.pop(assignment["job_id"], None)
+            if not worker["stopping"] and not self._closed.is_set():
+                self._request_worker()
+            worker["exited"].set()
+            self._changed.notify_all()
+
+        if future is not None:
+            future.set_exception(RuntimeError(reason))
+        self._wake()
+
+    def _fail_futures(self, futures, reason):
+        for future in futures:
+            # Requeued jobs are already running; cancelled ones are skipped
+            if future.running() or future.set_running_or_notify_cancel():
+                future.set_exception(RuntimeError(reason))
+
+    def _monitor(self):
+        while not self._closed.wait(self.health_interval):
+            self.health_check()
+
+    def submit(self, document_text, user_profile_concerns=None, user_profile_role=None):
+        """Queue a document for analysis and return a Future for its results"""
+        job_id = next(self._job_ids)
+        future = Future()
+        with self._lock:
+            if self._closed.is_set():
+                raise RuntimeError("AnalyzerPool has been shut down")
+            if self._spawner_error is not None:
+                raise RuntimeError(self._spawner_error)
+            self._futures[job_id] = future
+            self._pending.append((job_id, (job_id, document_text, user_profile_concerns, user_profile_role)))
+        self._wake()
+        return future
+
+    def analyze_document(self, document_text, user_profile_concerns=None, user_profile_role=None, timeout=None):
+        """
+        Blocking counterpart of LegalDocumentAnalyzer.analyze_document. Raises
+        concurrent.futures.TimeoutError if no result arrives within timeout
+        seconds; a job that hasn't been dispatched yet is then cancelled.
+        """
+        future = self.submit(document_text, user_profile_concerns, user_profile_role)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+
+    def health_check(self):
+        """
+        Report the state of the spawner and every worker. Workers whose process
+        has gone are removed (failing the job they were running) and replaced;
+        a dead spawner fails the queued jobs (see the class docstring).
+        """
+        spawner_alive = self._spawner.is_alive()
+        if not spawner_alive:
+            with self._lock:
+                self._lose_spawner(f"Spawner process (pid {self._spawner.pid}) exited with code {self._spawner.exitcode}")
+
+        now = time.time()
+        with self._lock:
+            workers = [(worker_id, dict(worker)) for worker_id, worker in self._workers.items()]
+            assignments = {
+                worker_id: (assignment["job_id"], assignment["started"])
+                for worker_id, assignment in self._assignments.items()
+            }
+
+        report = []
+        for worker_id, worker in workers:
+            alive = _pid_alive(worker["pid"])
+            job_id, started = assignments.get(worker_id, (None, None))
+            report.append({
+                "worker_id": worker_id,
+                "pid": worker["pid"],
+                "alive": alive,
+                "stopping": worker["stopping"],
+                "busy_job": job_id,
+                "busy_seconds": now - started if started is not None else None,
+                "memory": process_memory(worker["pid"]) if alive else None
+            })
+            if not alive:
+                self._remove_worker(worker_id, f"Worker {worker_id} (pid {worker['pid']}) is no longer running")
+
+        return {
+            "spawner": {"pid": self._spawner.pid, "alive": spawner_alive, "error": self._spawner_error},
+            "workers": report
+        }
+
+    def restart(self, timeout=600.0, start_timeout=60.0):
+        """
+        Gracefully replace every worker, one at a time. An old worker is asked
+        to stop only after its replacement has connected, so capacity never
+        drops; it finishes its current job first, or is killed if that takes
+        longer than timeout seconds. Raises RuntimeError, leaving the remaining
+        old workers running, if a replacement doesn't connect within
+        start_timeout seconds or can't be started at all.
+        """
+        with self._restart_lock:
+            with self._lock:
+                old_workers = list(self._workers)
+
+            for worker_id in old_workers:
+                with self._lock:
+                    worker = self._workers.get(worker_id)
+                    if worker is None or self._closed.is_set():
+                        continue
+                    new_id = self._request_worker()
+                    started = new_id is not None and self._changed.wait_for(
+                        lambda: new_id in self._workers or self._closed.is_set(),
+                        start_timeout
+                    )
+                    if not started or self._closed.is_set():
+                        break
+                    worker["stopping"] = True
+                self._wake()
+                self._wait_for_exit(worker_id, worker, timeout)
+            else:
+                return
+
+        if not self._closed.is_set():
+            raise RuntimeError(f"Restart stopped: no replacement for worker {worker_id} started within {start_timeout} seconds")
+
+    def _wait_for_exit(self, worker_id, worker, timeout):
+        if not worker["exited"].wait(timeout):
+            try:
+                os.kill(worker["pid"], signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            self._remove_worker(worker_id, f"Worker {worker_id} was killed after not stopping within {timeout} seconds")
+
+    def memory_report(self):
+        """
+        Summarize memory use of the parent, the spawner and the workers. The RSS
+        total counts shared model pages once per process; the PSS total splits
+        them between the processes sharing them, so the difference is the memory
+        saved.
+        """
+        with self._lock:
+            pids = {f"worker-{worker_id}": worker["pid"] for worker_id, worker in self._workers.items()}
+        processes = {
+            "parent": process_memory(os.getpid()),
+            "spawner": process_memory(self._spawner.pid)
+        }
+        processes.update({name: process_memory(pid) for name, pid in pids.items()})
+
+        measured = [m for m in processes.values() if m]
+        total_rss = sum(m["rss_kb"] for m in measured)
+        total_pss = sum(m["pss_kb"] for m in measured)
+        return {
+            "processes": processes,
+            "total_rss_kb": total_rss,
+            "total_pss_kb": total_pss,
+            "saved_kb": total_rss - total_pss
+        }
+
+    def shutdown(self, timeout=None):
+        """
+        Stop all workers after their current jobs (killing any still running
+        after timeout seconds), then the spawner and the pool's threads. Jobs
+        not yet dispatched fail with a RuntimeError.
+        """
+        with self._restart_lock:
+            with self._lock:
+                workers = list(self._workers.items())
+                for _, worker in workers:
+                    worker["stopping"] = True
+            self._wake()
+            for worker_id, worker in workers:
+                self._wait_for_exit(worker_id, worker, timeout)
+
+            with self._lock:
+                self._closed.set()
+                pending = [self._futures.pop(job_id) for job_id, _ in self._pending if job_id in self._futures]
+                self._pending.clear()
+                try:
+                    self._commands.send(None)
+                except OSError:
+                    pass
+            self._fail_futures(pending, "AnalyzerPool has been shut down")
+
+            # Closing the listener doesn't interrupt a blocked accept(), so
+            # connect once to let the accept thread see that the pool is closed.
+            # A raw connect doesn't wait for the auth handshake, so it can't
+            # block if the accept thread has already gone.
+            with socket.socket(socket.AF_UNIX) as wakeup:
+                try:
+                    wakeup.connect(self._address)
+                except OSError:
+                    pass
+            self._wake()
+            for thread in self._threads:
+                if thread is not threading.current_thread():
+                    thread.join()
+
+            self._listener.close()
+            self._commands.close()
+            self._spawner.join(timeout)
+            for conn in self._retired:
+                conn.close()
+            os.close(self._wakeup_read)
+            os.close(self._wakeup_write)
+            shutil.rmtree(self._socket_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the Legal Document Analyzer from a pre-fork worker pool")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Seconds to wait for a document's analysis")
+    args = parser.parse_args()
+
+    pool = AnalyzerPool(num_workers=args.workers)
+
+    report = pool.memory_report()
+    for name, memory in report["processes"].items():
+        if memory:
+            print(f"{name}: RSS {memory['rss_kb'] // 1024} MB, PSS {memory['pss_kb'] // 1024} MB, "
+                  f"shared {memory['shared_kb'] // 1024} MB")
+    print(f"Total RSS {report['total_rss_kb'] // 1024} MB, total PSS {report['total_pss_kb'] // 1024} MB, "
+          f"saved by sharing {report['saved_kb'] // 1024} MB")
+
+    # SIGHUP triggers a rolling restart of the workers
+    signal.signal(signal.SIGHUP, lambda signum, frame: threading.Thread(
+        target=pool.restart,
+        kwargs={"timeout": args.timeout},
+        daemon=True
+    ).start())
+
+    def analyze(document_text, concerns, role):
+        results = pool.analyze_document(
+            document_text,
+            user_profile_concerns=concerns,
+            user_profile_role=role,
+            timeout=args.timeout
+        )
+        return format_results_gradio(results)
+
+    # Let the UI hand the pool as many documents at once as there are workers
+    iface = build_interface(analyze, concurrency=pool.num_workers)
+    try:
+        iface.launch(share=True)
+    finally:
+        pool.shutdown(timeout=args.timeout)
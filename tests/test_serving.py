@@ -0,0 +1,173 @@
+import importlib
+import os
+import signal
+import sys
+import threading
+import time
+import types
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StubPart:
+    def share_memory(self):
+        pass
+
+
+class StubAnalyzer:
+    """Stands in for LegalDocumentAnalyzer: "sleep<seconds>" sleeps, "error" raises"""
+
+    def __init__(self):
+        self.clause_classifier = StubPart()
+        self.obligation_extractor = StubPart()
+
+    def analyze_document(self, document_text, user_profile_concerns=None, user_profile_role=None):
+        if document_text == "error":
+            raise ValueError("bad document")
+        if document_text.startswith("sleep"):
+            time.sleep(float(document_text[5:]))
+        return {"pid": os.getpid(), "text": document_text}
+
+
+@pytest.fixture(scope="module")
+def serving():
+    # serving imports torch and main (gradio, transformers, spaCy); stub them
+    stubs = {"main": types.ModuleType("main")}
+    stubs["main"].LegalDocumentAnalyzer = StubAnalyzer
+    stubs["main"].build_interface = lambda analyze, concurrency=1: None
+    stubs["main"].format_results_gradio = str
+    try:
+        import torch  # noqa: F401
+    except ImportError:
+        stubs["torch"] = types.ModuleType("torch")
+        stubs["torch"].set_num_threads = lambda n: None
+
+    saved = {name: sys.modules.get(name) for name in list(stubs) + ["serving"]}
+    sys.modules.update(stubs)
+    sys.modules.pop("serving", None)
+    try:
+        yield importlib.import_module("serving")
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+
+
+@pytest.fixture
+def pool(serving):
+    pool = serving.AnalyzerPool(num_workers=2, analyzer=StubAnalyzer(), health_interval=0.5)
+    try:
+        yield pool
+    finally:
+        pool.shutdown(timeout=5)
+
+
+def worker_pids(pool):
+    return {worker["pid"] for worker in pool.health_check()["workers"]}
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_jobs_run_on_all_workers(pool):
+    futures = [pool.submit("sleep0.2") for _ in range(4)]
+    results = [future.result(5) for future in futures]
+    assert len({result["pid"] for result in results}) == 2
+    assert pool.analyze_document("text", timeout=5)["text"] == "text"
+
+
+def test_analyzer_error_fails_only_that_job(pool):
+    with pytest.raises(RuntimeError, match="bad document"):
+        pool.analyze_document("error", timeout=5)
+    assert pool.analyze_document("after", timeout=5)["text"] == "after"
+
+
+def test_workers_killed_while_idle_are_replaced(pool):
+    old_pids = worker_pids(pool)
+    for pid in old_pids:
+        os.kill(pid, signal.SIGKILL)
+
+    assert pool.analyze_document("after kill", timeout=5)["text"] == "after kill"
+    assert wait_until(lambda: len(worker_pids(pool)) == 2)
+    assert not worker_pids(pool) & old_pids
+
+
+def test_worker_killed_mid_job_fails_its_job_immediately(pool):
+    future = pool.submit("sleep3")
+    assert wait_until(lambda: any(w["busy_job"] is not None for w in pool.health_check()["workers"]))
+    busy = next(w for w in pool.health_check()["workers"] if w["busy_job"] is not None)
+
+    os.kill(busy["pid"], signal.SIGKILL)
+    with pytest.raises(RuntimeError, match="exited"):
+        future.result(1)
+    assert pool.analyze_document("next", timeout=5)["text"] == "next"
+
+
+def test_timeout_raises(pool):
+    with pytest.raises(FutureTimeoutError):
+        pool.analyze_document("sleep1", timeout=0.2)
+
+
+def test_restart_replaces_workers_and_finishes_running_job(pool):
+    old_pids = worker_pids(pool)
+    future = pool.submit("sleep0.5")
+    time.sleep(0.1)
+
+    pool.restart(timeout=5, start_timeout=5)
+    assert future.result(5)["text"] == "sleep0.5"
+    assert wait_until(lambda: len(worker_pids(pool)) == 2)
+    assert not worker_pids(pool) & old_pids
+
+
+def test_dead_spawner_fails_queued_and_new_jobs(pool):
+    running = [pool.submit("sleep1") for _ in range(2)]
+    time.sleep(0.2)
+    queued = pool.submit("queued")
+
+    os.kill(pool._spawner.pid, signal.SIGKILL)
+    assert wait_until(lambda: not pool.health_check()["spawner"]["alive"])
+
+    with pytest.raises(RuntimeError, match="Spawner"):
+        queued.result(5)
+    with pytest.raises(RuntimeError, match="Spawner"):
+        pool.submit("new")
+    assert [future.result(5)["text"] for future in running] == ["sleep1", "sleep1"]
+
+
+def test_restart_keeps_old_workers_without_spawner(pool):
+    old_pids = worker_pids(pool)
+    os.kill(pool._spawner.pid, signal.SIGKILL)
+    assert wait_until(lambda: not pool.health_check()["spawner"]["alive"])
+
+    with pytest.raises(RuntimeError, match="Restart stopped"):
+        pool.restart(timeout=5, start_timeout=1)
+    assert worker_pids(pool) == old_pids
+
+
+def test_memory_report_lists_all_processes(pool):
+    report = pool.memory_report()
+    assert {"parent", "spawner"} <= set(report["processes"])
+    assert sum(name.startswith("worker-") for name in report["processes"]) == 2
+    assert report["total_rss_kb"] >= report["total_pss_kb"] > 0
+
+
+def test_shutdown_stops_threads_and_fails_new_jobs(serving):
+    pool = serving.AnalyzerPool(num_workers=1, analyzer=StubAnalyzer(), health_interval=0.5)
+    pids = worker_pids(pool)
+    pool.shutdown(timeout=5)
+
+    assert threading.active_count() == 1
+    assert wait_until(lambda: not any(serving._pid_alive(pid) for pid in pids))
+    with pytest.raises(RuntimeError, match="shut down"):
+        pool.submit("late")
@@ -0,0 +1,89 @@
+import hashlib
+import re
+
+# Words and numbers survive normalization; case, punctuation and spacing don't
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def normalize_sentence(sentence):
+    """Lowercase a sentence and reduce it to its word tokens"""
+    return " ".join(TOKEN_PATTERN.findall(sentence.lower()))
+
+
+def simhash(text, shingle_size=3, bits=64):
+    """64-bit SimHash of a normalized sentence over word shingles"""
+    tokens = text.split()
+    if len(tokens) < shingle_size:
+        shingles = [" ".join(tokens)]
+    else:
+        shingles = [" ".join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)]
+
+    weights = [0] * bits
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=bits // 8).digest(), "big")
+        for bit in range(bits):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+class SentenceDeduplicator:
+    """
+    Groups exact and near-duplicate sentences into clusters.
+
+    Sentences are normalized first, so differences in case, punctuation and
+    spacing are treated as exact duplicates. Remaining sentences are compared
+    by SimHash: two sentences join the same cluster when their fingerprints
+    differ in at most max_distance bits. Candidates are found by splitting the
+    fingerprint into max_distance + 1 bands, since any pair within that
+    distance must agree on at least one band.
+    """
+
+    def __init__(self, max_distance=3, bits=64):
+        self.max_distance = max_distance
+        self.bits = bits
+        self.num_bands = max_distance + 1
+        self.band_width = bits // self.num_bands
+        self.exact = {}
+        self.bands = {}
+        self.fingerprints = []
+        self.representatives = []
+        self.sizes = []
+
+    def _band_keys(self, fingerprint):
+        mask = (1 << self.band_width) - 1
+        return [(band, fingerprint >> (band * self.band_width) & mask) for band in range(self.num_bands)]
+
+    def _find_near_duplicate(self, fingerprint):
+        for key in self._band_keys(fingerprint):
+            for candidate in self.bands.get(key, ()):
+                if bin(fingerprint ^ self.fingerprints[candidate]).count("1") <= self.max_distance:
+                    return candidate
+        return None
+
+    def add(self, sentence):
+        """Assign a sentence to a cluster and return the cluster id"""
+        normalized = normalize_sentence(sentence)
+        cluster_id = self.exact.get(normalized)
+
+        fingerprint = None
+        if cluster_id is None and self.max_distance > 0:
+            fingerprint = simhash(normalized, bits=self.bits)
+            cluster_id = self._find_near_duplicate(fingerprint)
+
+        if cluster_id is None:
+            cluster_id = len(self.representatives)
+            self.representatives.append(sentence)
+            self.sizes.append(0)
+            self.fingerprints.append(fingerprint)
+            if fingerprint is not None:
+                for key in self._band_keys(fingerprint):
+                    self.bands.setdefault(key, []).append(cluster_id)
+
+        self.exact.setdefault(normalized, cluster_id)
+        self.sizes[cluster_id] += 1
+        return cluster_id
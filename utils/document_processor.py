@@ -3,29 +3,84 @@ from bs4 import BeautifulSoup
 import re
 import pandas as pd
 
-# Load datasets
-# legalbench = datasets.load_dataset("nguha/legalbench") # This line causes the error
-legalbench = datasets.load_dataset("nguha/legalbench", "abercrombie") # Fixed line
 try:
-    caselaw = datasets.load_dataset("HFforLegal/case-law", streaming=True)
-    print(caselaw)
-except Exception as e:
-    print(f"Error loading dataset: {e}")
+    from lxml import etree
+except ImportError:  # fall back to BeautifulSoup for markup
+    etree = None
+
+# Cheap check for anything an HTML parser would change: tag-like text or a
+# character reference (with or without the closing semicolon). Plain text
+# skips the HTML parser.
+MARKUP_PATTERN = re.compile(r'<[A-Za-z/!?]|&(?:#[0-9]|#[xX][0-9A-Fa-f]|[A-Za-z])')
+
+# A complete start or end tag, or a comment/doctype. Only text containing one
+# goes to lxml: lxml reads an unclosed "<y" in plain text as a tag running to
+# the end of the input, where html.parser keeps it as text.
+TAG_PATTERN = re.compile(r'<!--|<![Dd][Oo][Cc][Tt][Yy][Pp][Ee]\s|<(?:[A-Za-z][A-Za-z0-9:-]*(?:\s[^<>]*)?/?|/[A-Za-z][A-Za-z0-9:-]*\s*)>')
+
+# Anything but word characters, whitespace and common punctuation
+SPECIAL_CHARS_PATTERN = re.compile(r'[^\w\s\.\,\;\:\(\)\[\]\{\}\-\"\'\?]+')
+
+
+class _TextCollector:
+    """lxml parser target that keeps text content and skips script/style bodies"""
+
+    SKIP_TAGS = {"script", "style", "template"}
+
+    def __init__(self):
+        self.chunks = []
+        self.skip_depth = 0
+
+    def start(self, tag, attrib):
+        if tag in self.SKIP_TAGS:
+            self.skip_depth += 1
+
+    def end(self, tag):
+        if tag in self.SKIP_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+
+    def data(self, data):
+        if not self.skip_depth:
+            self.chunks.append(data)
+
+    def close(self):
+        return "".join(self.chunks)
+
+
+def extract_text(text, chunk_size=1 << 16):
+    """
+    Strip markup from text, streaming it through lxml when available.
+
+    Text with no tags or character references is returned unchanged. Text
+    with tag-like characters or references but no complete tag (e.g. "x<y" or
+    "&copy 2024"), and text containing CDATA sections, which lxml drops, goes
+    to BeautifulSoup's html.parser as before. Everything else goes to lxml,
+    which, like get_text, drops script, style and template contents and
+    decodes references with or without the semicolon. Badly malformed HTML
+    may still be repaired differently than by html.parser.
+    """
+    if not MARKUP_PATTERN.search(text):
+        return text
+    if etree is None or "<![CDATA[" in text or not TAG_PATTERN.search(text):
+        return BeautifulSoup(text, "html.parser").get_text()
+
+    parser = etree.HTMLParser(target=_TextCollector())
+    for start in range(0, len(text), chunk_size):
+        parser.feed(text[start:start + chunk_size])
+    return parser.close()
+
 
 def clean_document(text):
-    # Remove HTML tags if present
-    soup = BeautifulSoup(text, "html.parser")
-    text = soup.get_text()
-    
-    # Normalize whitespace
-    text = re.sub(r'\s+', ' ', text)
-    
+    # Remove HTML tags if present (plain text is returned untouched)
+    text = extract_text(text)
+
+    # Normalize whitespace. str.split() splits on the same characters as \s, and
+    # collapses line breaks too, so no separate line-break pass is needed.
+    text = ' '.join(text.split())
+
     # Remove special characters but keep punctuation
-    text = re.sub(r'[^\w\s\.\,\;\:\(\)\[\]\{\}\-\"\'\?]', '', text)
-    
-    # Standardize line breaks
-    text = re.sub(r'(\r\n|\r|\n)', '\n', text)
-    
+    text = SPECIAL_CHARS_PATTERN.sub('', text)
+
     return text.strip()
 
 def segment_document(text):
@@ -101,8 +156,18 @@ def process_legal_document(doc_text):
         "annotations": annotations
     }
 
-# Process a sample document
-sample_doc = legalbench["train"][1]["text"]  # Adjust according to actual dataset structure
-result = process_legal_document(sample_doc)
+if __name__ == "__main__":
+    # Load datasets
+    # legalbench = datasets.load_dataset("nguha/legalbench") # This line causes the error
+    legalbench = datasets.load_dataset("nguha/legalbench", "abercrombie") # Fixed line
+    try:
+        caselaw = datasets.load_dataset("HFforLegal/case-law", streaming=True)
+        print(caselaw)
+    except Exception as e:
+        print(f"Error loading dataset: {e}")
+
+    # Process a sample document
+    sample_doc = legalbench["train"][1]["text"]  # Adjust according to actual dataset structure
+    result = process_legal_document(sample_doc)
 
-print(result)
\ No newline at end of file
+    print(result)
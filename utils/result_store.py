@@ -0,0 +1,213 @@
+import json
+import os
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# Columnar layout for analyze_document results. Repeated strings (titles,
+# labels, parties, entity types) are dictionary encoded, so each distinct value
+# is stored once; score vectors become one float64 column per label.
+
+SCORE_PREFIX = "score_"
+TABLE_NAMES = ("sections", "extractions", "entities", "insights")
+EXTRACTION_KINDS = {"obligations": "obligation", "rights": "right", "other": "other"}
+
+DICT_STRING = pa.dictionary(pa.int32(), pa.string())
+
+EXTRACTIONS_SCHEMA = pa.schema([
+    ("section_id", pa.int32()),
+    ("kind", DICT_STRING),
+    ("sentence", pa.string()),
+    ("party", DICT_STRING),
+    ("action", pa.string()),
+    ("conditions", pa.list_(pa.string()))
+])
+
+ENTITIES_SCHEMA = pa.schema([
+    ("entity_type", DICT_STRING),
+    ("value", pa.string())
+])
+
+INSIGHTS_SCHEMA = pa.schema([
+    ("type", DICT_STRING),
+    ("concern", DICT_STRING),
+    ("obligation", pa.string()),
+    ("section", DICT_STRING),
+    ("importance", DICT_STRING)
+])
+
+
+def _table(columns, schema, metadata=None):
+    arrays = [pa.array(columns[field.name], type=field.type) for field in schema]
+    return pa.Table.from_arrays(arrays, schema=schema.with_metadata(metadata) if metadata else schema)
+
+
+def to_tables(results):
+    """
+    Convert an analyze_document result into typed Arrow tables:
+    sections, extractions, entities and insights
+    """
+    sections = results["sections"]
+    labels = []
+    for section in sections:
+        for label in section["section_info"]["all_labels"]:
+            if label not in labels:
+                labels.append(label)
+
+    section_columns = {
+        "section_title": [],
+        "section_text": [],
+        "classification": [],
+        "confidence": [],
+        "has_extractions": []
+    }
+    section_columns.update({SCORE_PREFIX + label: [] for label in labels})
+    extraction_columns = {field.name: [] for field in EXTRACTIONS_SCHEMA}
+
+    for section_id, section in enumerate(sections):
+        info = section["section_info"]
+        section_columns["section_title"].append(info["section_title"])
+        section_columns["section_text"].append(info["section_text"])
+        section_columns["classification"].append(info["classification"])
+        section_columns["confidence"].append(info["confidence"])
+        for label in labels:
+            section_columns[SCORE_PREFIX + label].append(info["all_labels"].get(label))
+
+        extractions = section["extractions"]
+        section_columns["has_extractions"].append(extractions is not None)
+        if extractions is None:
+            continue
+        for key, kind in EXTRACTION_KINDS.items():
+            for item in extractions["extractions"][key]:
+                extraction_columns["section_id"].append(section_id)
+                extraction_columns["kind"].append(kind)
+                extraction_columns["sentence"].append(item["sentence"])
+                extraction_columns["party"].append(item.get("party"))
+                extraction_columns["action"].append(item.get("action"))
+                extraction_columns["conditions"].append(item.get("conditions"))
+
+    sections_schema = pa.schema(
+        [
+            ("section_title", DICT_STRING),
+            ("section_text", pa.string()),
+            ("classification", DICT_STRING),
+            ("confidence", pa.float64()),
+            ("has_extractions", pa.bool_())
+        ]
+        + [(SCORE_PREFIX + label, pa.float64()) for label in labels]
+    )
+
+    grouped_entities = results["entities"].get("grouped_entities", {})
+    entity_columns = {"entity_type": [], "value": []}
+    for entity_type, values in grouped_entities.items():
+        entity_columns["entity_type"].extend([entity_type] * len(values))
+        entity_columns["value"].extend(values)
+
+    insights = results.get("personalized_insights")
+    insight_columns = {field.name: [] for field in INSIGHTS_SCHEMA}
+    for insight in insights or []:
+        for name in insight_columns:
+            insight_columns[name].append(insight.get(name))
+
+    # Everything needed to rebuild the dict shape exactly that isn't in the columns
+    metadata = {"result_layout": json.dumps({
+        "labels": labels,
+        "entity_types": list(grouped_entities),
+        "has_insights": insights is not None
+    })}
+
+    return {
+        "sections": _table(section_columns, sections_schema, metadata),
+        "extractions": _table(extraction_columns, EXTRACTIONS_SCHEMA),
+        "entities": _table(entity_columns, ENTITIES_SCHEMA),
+        "insights": _table(insight_columns, INSIGHTS_SCHEMA)
+    }
+
+
+def from_tables(tables):
+    """Rebuild the analyze_document dict shape from to_tables output"""
+    sections_table = tables["sections"]
+    layout = json.loads(sections_table.schema.metadata[b"result_layout"])
+    sections_rows = sections_table.to_pylist()
+
+    extractions = [
+        {"obligations": [], "rights": [], "other": []} if row["has_extractions"] else None
+        for row in sections_rows
+    ]
+    kind_keys = {kind: key for key, kind in EXTRACTION_KINDS.items()}
+    for row in tables["extractions"].to_pylist():
+        if row["kind"] == "other":
+            item = {"sentence": row["sentence"]}
+        else:
+            item = {
+                "sentence": row["sentence"],
+                "party": row["party"],
+                "action": row["action"],
+                "conditions": row["conditions"]
+            }
+        extractions[row["section_id"]][kind_keys[row["kind"]]].append(item)
+
+    sections = []
+    for row, section_extractions in zip(sections_rows, extractions):
+        sections.append({
+            "section_info": {
+                "section_title": row["section_title"],
+                "section_text": row["section_text"],
+                "classification": row["classification"],
+                "confidence": row["confidence"],
+                "all_labels": {
+                    label: row[SCORE_PREFIX + label]
+                    for label in layout["labels"]
+                    if row[SCORE_PREFIX + label] is not None
+                }
+            },
+            "extractions": {
+                "section_title": row["section_title"],
+                "extractions": section_extractions
+            } if section_extractions is not None else None
+        })
+
+    grouped_entities = {entity_type: [] for entity_type in layout["entity_types"]}
+    for row in tables["entities"].to_pylist():
+        grouped_entities[row["entity_type"]].append(row["value"])
+
+    insights = None
+    if layout["has_insights"]:
+        insights = [
+            {name: value for name, value in row.items() if value is not None}
+            for row in tables["insights"].to_pylist()
+        ]
+
+    return {
+        "entities": {"grouped_entities": grouped_entities},
+        "sections": sections,
+        "personalized_insights": insights
+    }
+
+
+def write_results(results, path, compression="uncompressed"):
+    """
+    Write an analyze_document result to a directory of Arrow IPC (Feather)
+    files, one per table. Uncompressed files can be memory-mapped on read;
+    pass compression="zstd" or "lz4" to trade that for smaller files.
+    """
+    os.makedirs(path, exist_ok=True)
+    for name, table in to_tables(results).items():
+        feather.write_feather(table, os.path.join(path, f"{name}.arrow"), compression=compression)
+
+
+def read_tables(path, memory_map=True):
+    """
+    Read the tables written by write_results. With memory_map and uncompressed
+    files, numeric columns are zero-copy views of the file, e.g.
+    tables["sections"].column("confidence").to_numpy() or table.to_pandas().
+    """
+    return {
+        name: feather.read_table(os.path.join(path, f"{name}.arrow"), memory_map=memory_map)
+        for name in TABLE_NAMES
+    }
+
+
+def read_results(path):
+    """Read results written by write_results back into the analyze_document dict shape"""
+    return from_tables(read_tables(path))